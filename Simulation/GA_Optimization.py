@@ -1,16 +1,58 @@
 import copy
+import time
 import pandas as pd
-import numpy,random
+import numpy
+from operator import attrgetter
 from deap import base, creator, tools
 import matplotlib.pyplot as plt
 from ising_problem import converter
+from rng_streams import make_rng
+
+
+# DEAP operators draw from the global `random` module; these equivalents take an explicit numpy Generator
+# so that every stochastic step of a run is driven by the stream passed to GA_Optimizer.
+def sel_tournament(individuals, k, tournsize, rng):
+    chosen = []
+    for i in range(k):
+        aspirants = [individuals[j] for j in rng.integers(0, len(individuals), size=tournsize)]
+        chosen.append(max(aspirants, key=attrgetter('fitness')))
+    return chosen
+
+def cx_one_point(ind1, ind2, rng):
+    size = min(len(ind1), len(ind2))
+    cxpoint = int(rng.integers(1, size))
+    ind1[cxpoint:], ind2[cxpoint:] = ind2[cxpoint:], ind1[cxpoint:]
+    return ind1, ind2
+
+def cx_two_point(ind1, ind2, rng):
+    size = min(len(ind1), len(ind2))
+    cxpoint1 = int(rng.integers(1, size + 1))
+    cxpoint2 = int(rng.integers(1, size))
+    if cxpoint2 >= cxpoint1:
+        cxpoint2 += 1
+    else:
+        cxpoint1, cxpoint2 = cxpoint2, cxpoint1
+    ind1[cxpoint1:cxpoint2], ind2[cxpoint1:cxpoint2] = ind2[cxpoint1:cxpoint2], ind1[cxpoint1:cxpoint2]
+    return ind1, ind2
+
+def cx_uniform(ind1, ind2, indpb, rng):
+    for i in range(min(len(ind1), len(ind2))):
+        if rng.random() < indpb:
+            ind1[i], ind2[i] = ind2[i], ind1[i]
+    return ind1, ind2
+
+def mut_flip_bit(individual, indpb, rng):
+    for i in range(len(individual)):
+        if rng.random() < indpb:
+            individual[i] = type(individual[i])(not individual[i])
+    return individual,
 
 class GA_Optimizer():
 
     """
     Class implementing a Genetic Optimizer based on DEAP
     """
-    def __init__(self, problem_size, optimization='max', sel=lambda:None, cx=lambda:None, mut=lambda:None, verbose=False):
+    def __init__(self, problem_size, optimization='max', sel=lambda:None, cx=lambda:None, mut=lambda:None, verbose=False, rng=None, observers=None):
         """
         Initialization of Deap Creator, Toolbox and Stats objects.
         By Default, the GA performs a binary optimization. Toolbox object must be adapted to other cases.
@@ -27,12 +69,17 @@ class GA_Optimizer():
         :param problem_size: (int) Size of the problem
         :param optimization: (Str) 'min' or 'max' for Minimization or Maximization - 'max' default
         :param verbose: (Bool) Default False, set True for displaying the evolution.
+        :param rng: seed or numpy Generator driving every random draw of the GA (see rng_streams.spawn_rngs
+            for independent streams per run/worker). None for fresh entropy.
+        :param observers: (list) callables receiving one dict per generation (see add_observer and progress.py).
         ...
         """
+        self.rng = make_rng(rng)
         self.cx = cx
         self.mut = mut
         self.sel = sel
         self.verbose = verbose
+        self.observers = list(observers) if observers is not None else []
         self.N = problem_size
         self.deap_creator = creator
         self.toolbox = base.Toolbox()
@@ -48,19 +95,19 @@ class GA_Optimizer():
 
         ### toolbox init ###
 
-        self.toolbox.register('attr_float', lambda: random.randint(0, 1))
+        self.toolbox.register('attr_float', lambda: int(self.rng.integers(0, 2)))
         # Ind Register
         self.toolbox.register('individual', tools.initRepeat, self.deap_creator.Individual, self.toolbox.attr_float, n=self.N)
         # Pop Register
         self.toolbox.register('population', tools.initRepeat, list, self.toolbox.individual)
         # Crossover Operator
-        self.toolbox.register('one_point', tools.cxOnePoint) #Default
+        self.toolbox.register('one_point', cx_one_point, rng=self.rng) #Default
         self.toolbox.register('custom_cx', self.cx)
         # Mutation
-        self.toolbox.register('mutate', tools.mutFlipBit, indpb=1) #Default
+        self.toolbox.register('mutate', mut_flip_bit, indpb=1, rng=self.rng) #Default
         self.toolbox.register('custom_mut', self.mut)
         # Selection
-        self.toolbox.register('select_TS', tools.selTournament, tournsize=3) #Default
+        self.toolbox.register('select_TS', sel_tournament, tournsize=3, rng=self.rng) #Default
         self.toolbox.register('custom_sel', self.sel)
 
         ### Stats Collector ###
@@ -77,6 +124,36 @@ class GA_Optimizer():
         # HOF
         self.hof = tools.HallOfFame(1)
 
+    def add_observer(self, observer):
+        """
+        Register a progress observer.
+        ...
+        :param observer: callable taking a dict with keys gen, nevals, n_evals (cumulative), avg, std, min, max,
+            best (list), best_fitness, time (wall seconds since start_GA, excluding time spent in observers), eval_time and cx_time (cumulative seconds
+            spent in fitness evaluations and in the crossover operator). It is called once per generation, after the
+            logbook is updated. If the observer has a flush() method, it is called at the end of optimize (sinks
+            use it to emit the final generation they suppressed).
+        ...
+        :return: None
+        """
+        self.observers.append(observer)
+
+    def _notify(self):
+        if not self.observers:
+            return
+        t = time.perf_counter()
+        entry = self.logbook[-1]
+        event = {'gen': entry['gen'], 'nevals': entry['nevals'], 'n_evals': self.n_evals,
+                 'time': t - self.t_start - self.observer_time, 'eval_time': self.eval_time, 'cx_time': self.cx_time}
+        for field in self.stats.fields:
+            event[field] = float(entry[field])
+        event['best'] = list(entry['best'])
+        event['best_fitness'] = float(entry['best'].fitness.values[0])
+        for observer in self.observers:
+            observer(event)
+        # Time spent in the observers themselves is excluded from the run clock
+        self.observer_time += time.perf_counter() - t
+
     def set_Fitness_Function(self, fitness):
         """
         Define fitness function for the optimization
@@ -98,6 +175,8 @@ class GA_Optimizer():
         :return: None
         """
         self.pop_size = pop_size
+        self.t_start = time.perf_counter()
+        self.eval_time, self.cx_time, self.observer_time = 0.0, 0.0, 0.0
 
         if pop_list == None:
             self.pop = self.toolbox.population(n=self.pop_size)
@@ -106,7 +185,9 @@ class GA_Optimizer():
 
         self.init_pop = copy.copy(self.pop)
 
+        t = time.perf_counter()
         fitness = list(map(self.toolbox.evaluate, self.pop))
+        self.eval_time += time.perf_counter() - t
 
         for self.ind, fit in zip(self.pop, fitness):
             self.ind.fitness.values = [fit]
@@ -115,8 +196,10 @@ class GA_Optimizer():
 
         record = self.stats.compile(self.pop)
         self.logbook.record(gen=1, nevals=len(self.pop), **record, best= self.hof[0])
+        self.n_evals = len(self.pop)
         if self.verbose:
             print(self.logbook.stream)
+        self._notify()
 
 
     def optimize(self, elitism=True, sel=True,  cx=True, mut=True, **kwargs):
@@ -139,21 +222,22 @@ class GA_Optimizer():
             external function.
         :keyword **custom_sel (func): Custom Selection Operation as Deap register. Use a function returning a list of
         individuals and which has at least two parameters the population to select from and the number of individuals
-        to select.
+        to select. Prefer the rng-aware operators of this module: DEAP tools draw from the global `random` module
+        and make the run non-reproducible from GA.rng.
             For instance:
-                rul_sel = GA.toolbox.register('custom_sel', tools.selRoulette)
-                GA.optimize(n_gen=100, elitism=True, sel=True,  cx=True, mut=True, mut_pb=0.1, custom_sel=rul_sel)
+                tour5 = GA.toolbox.register('custom_sel', sel_tournament, k=10, tournsize=5, rng=GA.rng)
+                GA.optimize(n_gen=100, elitism=True, sel=True,  cx=True, mut=True, mut_pb=0.1, custom_sel=tour5)
         :keyword **custom_cx (func): Custom Crossover Operation as Deap register. Use a function which takes as input
         the mating pool and return as output the modified offspring set. Specify the cx_pb in it.
         Be sure to deleting the fitness of created individuals.
             For instance:
-                def two_point(offspring, cx_pb):
+                def two_point(offspring, cx_pb, rng):
                     for child1, child2 in zip(offspring[::2], offspring[1::2]):
-                        if random.random() < cx_pb:
-                            tools.cxTwoPoint(child1, child2)
+                        if rng.random() < cx_pb:
+                            cx_two_point(child1, child2, rng)
                             del child1.fitness.values
                             del child2.fitness.values
-                two_point = GA.toolbox.register('custom_cx', two_point, cx_pb=0.9)
+                two_point = GA.toolbox.register('custom_cx', two_point, cx_pb=0.9, rng=GA.rng)
                 GA.optimize(n_gen=100, elitism=True, sel=True,  cx=True, mut=True, mut_pb=0.7, custom_cx=two_point)
         :keyword **custom_mut (func): Custom Mutation Operation as Deap register. Use a function which takes as input
         the mating pool and return as output the modified offspring set. Specify the mut_pb in it.
@@ -194,29 +278,34 @@ class GA_Optimizer():
                 offspring = self.pop
             offspring = list(map(self.toolbox.clone, offspring))
             # Genetic Crossover
+            t = time.perf_counter()
             if cx:
                 if 'custom_cx' in kwargs:
                     self.toolbox.custom_cx(offspring)
 
                 else:
                     for child1, child2 in zip(offspring[::2], offspring[1::2]):
-                        if random.random() < self.cx_pb:
+                        if self.rng.random() < self.cx_pb:
                             self.toolbox.one_point(child1, child2)
                             del child1.fitness.values
                             del child2.fitness.values
 
+            self.cx_time += time.perf_counter() - t
+
             # Genetic Mutation
             if mut:
                 if 'custom_mut' in kwargs:
                     self.toolbox.custom_mut(self.pop)
                 else:
                     for mutant in offspring:
-                        if random.random() < self.mut_pb:
+                        if self.rng.random() < self.mut_pb:
                             self.toolbox.mutate(mutant)
                             del mutant.fitness.values
             # Evaluate the new individuals in the population
             invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+            t = time.perf_counter()
             fitness = list(map(self.toolbox.evaluate, invalid_ind))
+            self.eval_time += time.perf_counter() - t
             for ind, fit in zip(invalid_ind, fitness):
                 ind.fitness.values = [fit]
 
@@ -236,6 +325,7 @@ class GA_Optimizer():
             g = g+1
             if self.verbose:
                 print(self.logbook.stream)
+            self._notify()
 
             # Check Termination Criteria
             if 'max_evals' in kwargs and self.n_evals >= kwargs['max_evals']:
@@ -247,6 +337,10 @@ class GA_Optimizer():
                 if self.n_evals >= kwargs['max_evals'] or g >= kwargs['max_gen']+1:
                     termination_criteria = True
 
+        for observer in self.observers:
+            if hasattr(observer, 'flush'):
+                observer.flush()
+
         return self.pop, self.logbook #Ho aggiunto io self.pop
 
     def save_log_to_csv(self, filename=None):
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from run import GA_for_Ising
+from rng_streams import spawn_seeds
+
+OPERATORS = ('qmo', 'uniform', '1-point', '2-point')
+BUDGETS = ('time', 'n_evals', 'eval_time', 'cx_time')
+
+
+class TraceRecorder():
+    """
+    GA_Optimizer observer keeping the per-generation events of a run as rows.
+    """
+    def __init__(self, **labels):
+        self.labels = labels
+        self.rows = []
+
+    def __call__(self, event):
+        row = dict(self.labels)
+        for key in ('gen', 'n_evals', 'time', 'eval_time', 'cx_time', 'best_fitness'):
+            row[key] = event[key]
+        self.rows.append(row)
+
+
+def run_benchmark(confs, operators=OPERATORS, n_seeds=10, root_seed=0, popsize=10, nlev=0, max_gen=100,
+                  max_evals=1e5, observers=None):
+    """
+    Run every operator on every instance with n_seeds independent seeds.
+    Seed i of an instance is the same SeedSequence for every operator, so all operators start from the same
+    initial population (common random numbers).
+    ...
+    :param confs: list of instance files (e.g. Instances_data/conf1.txt)
+    :param operators: operators accepted by GA_for_Ising.execute
+    :param n_seeds: (int) runs per (instance, operator)
+    :param root_seed: root seed of the whole benchmark
+    :param popsize, nlev, max_gen, max_evals: passed to GA_for_Ising / execute
+    :param observers: extra observers attached to every run (e.g. a ConsoleProgress)
+    ...
+    :return: DataFrame of traces, one row per generation with columns instance, operator, seed, gen, n_evals,
+        time, eval_time, cx_time (for QMO: circuit construction and simulation) and best_fitness.
+    """
+    seeds = spawn_seeds(root_seed, len(confs) * n_seeds)
+    rows = []
+    for i, conf in enumerate(confs):
+        for seed in range(n_seeds):
+            for operator in operators:
+                recorder = TraceRecorder(instance=conf, operator=operator, seed=seed)
+                alg = GA_for_Ising(conf=conf, popsize=popsize, seed=seeds[i * n_seeds + seed],
+                                   observers=[recorder] + list(observers or []))
+                alg.execute(operator, nlev=nlev, max_gen=max_gen, max_evals=max_evals)
+                rows.extend(recorder.rows)
+    return pd.DataFrame.from_records(rows)
+
+
+def time_to_target(traces, targets=(0.9, 0.95, 0.99, 1.0), best_known=None):
+    """
+    Cost for each run to reach each quality level.
+    A target q on an instance is reached when best_fitness >= q * best_known[instance]
+    (Ising fitness -H of the best solutions is positive).
+    ...
+    :param traces: DataFrame returned by run_benchmark
+    :param targets: quality levels as fractions of the best known fitness
+    :param best_known: dict instance -> reference fitness. Default: best fitness found by any run.
+    ...
+    :return: DataFrame with columns instance, operator, seed, target, reached and the budgets
+        (time, n_evals, eval_time, cx_time) at the first generation reaching the target (NaN if never reached).
+    """
+    if best_known is None:
+        best_known = traces.groupby('instance')['best_fitness'].max().to_dict()
+    rows = []
+    for (instance, operator, seed), run in traces.groupby(['instance', 'operator', 'seed'], sort=False):
+        run = run.sort_values('gen')
+        fitness = run['best_fitness'].to_numpy()
+        for q in targets:
+            row = {'instance': instance, 'operator': operator, 'seed': seed, 'target': q}
+            hit = np.flatnonzero(fitness >= q * best_known[instance])
+            row['reached'] = len(hit) > 0
+            for budget in BUDGETS:
+                row[budget] = run[budget].iloc[hit[0]] if len(hit) else np.nan
+            rows.append(row)
+    return pd.DataFrame.from_records(rows)
+
+
+def ecdf(ttt, budget='time'):
+    """
+    Empirical cumulative distribution of the cost to target: for each operator, fraction of
+    (instance, seed, target) problems solved within each budget value. Every curve starts with a
+    (budget=0, fraction=0) point, so an operator that reaches no target still appears, stuck at 0.
+    ...
+    :param ttt: DataFrame returned by time_to_target
+    :param budget: 'time', 'n_evals', 'eval_time' or 'cx_time'
+    ...
+    :return: DataFrame with columns operator, budget, fraction
+    """
+    rows = []
+    for operator, group in ttt.groupby('operator', sort=False):
+        costs = np.concatenate([[0.0], np.sort(group[budget].dropna().to_numpy())])
+        fraction = np.arange(len(costs)) / len(group)
+        rows.append(pd.DataFrame({'operator': operator, 'budget': costs, 'fraction': fraction}))
+    return pd.concat(rows, ignore_index=True)
+
+
+def performance_profile(ttt, budget='time', taus=None):
+    """
+    Dolan-More performance profile: rho(tau) is the fraction of (instance, seed, target) problems on which
+    the operator cost is within a factor tau of the cheapest operator. Unsolved problems count as never solved.
+    Budgets can be 0 (e.g. cx_time when a target is reached at generation 1): an operator matching a zero
+    cheapest cost gets ratio 1, one with a positive cost against a zero cheapest cost gets ratio inf.
+    ...
+    :param ttt: DataFrame returned by time_to_target
+    :param budget: 'time', 'n_evals', 'eval_time' or 'cx_time'
+    :param taus: ratios at which the profile is evaluated. Default: 50 log-spaced values in [1, max finite ratio].
+    ...
+    :return: DataFrame with columns operator, tau, rho
+    """
+    cost = ttt.pivot_table(index=['instance', 'seed', 'target'], columns='operator', values=budget, dropna=False)
+    best = cost.min(axis=1)
+    ratio = cost.div(best, axis=0).where(cost.ne(best, axis=0), 1.0)
+    ratio = ratio.where(cost.notna(), np.inf)
+    if taus is None:
+        finite = ratio.to_numpy()[np.isfinite(ratio.to_numpy())]
+        taus = np.geomspace(1, max(finite.max(), 1 + 1e-9), 50) if len(finite) else np.ones(1)
+    rows = []
+    for operator in ratio.columns:
+        r = ratio[operator].to_numpy()
+        for tau in taus:
+            rows.append({'operator': operator, 'tau': tau, 'rho': np.mean(r <= tau)})
+    return pd.DataFrame.from_records(rows)
+
+
+def cost_breakdown(traces):
+    """
+    Split the wall time of each run into fitness evaluation, crossover (circuit simulation for QMO) and the rest
+    of the GA loop, averaged per operator.
+    ...
+    :param traces: DataFrame returned by run_benchmark
+    ...
+    :return: DataFrame indexed by operator with columns time, eval_time, cx_time, other_time, n_evals
+    """
+    last = traces.sort_values('gen').groupby(['instance', 'operator', 'seed']).tail(1)
+    out = last.groupby('operator')[['time', 'eval_time', 'cx_time', 'n_evals']].mean()
+    out['other_time'] = out['time'] - out['eval_time'] - out['cx_time']
+    return out[['time', 'eval_time', 'cx_time', 'other_time', 'n_evals']]
+
+
+if __name__ == "__main__":
+    traces = run_benchmark(['../Instances_data/conf%d.txt' % i for i in range(1, 11)], n_seeds=5)
+    ttt = time_to_target(traces)
+    print(cost_breakdown(traces))
+    print(performance_profile(ttt, budget='time').groupby('operator')['rho'].last())
@@ -1,30 +1,33 @@
-from random import uniform as runif
-from random import random
 from deap import creator, base, tools
+from rng_streams import make_rng
 
-def rBit(): #Generate a random bit
-    if random()<0.5:
+def rBit(rng=None): #Generate a random bit
+    rng = make_rng(rng)
+    if rng.random()<0.5:
         return 0
     else:
         return 1
-def rInd(l): #Generate random binary individual of length l
+def rInd(l, rng=None): #Generate random binary individual of length l
+    rng = make_rng(rng)
     o = []
     for i in range(l):
-        o.append(rBit())
+        o.append(rBit(rng))
     return o
-def h_initialise(d, out): #Instance generator (writes the coefficients in a file)
+def h_initialise(d, out, rng=None): #Instance generator (writes the coefficients in a file)
+    rng = make_rng(rng)
     file = open(out, "a")
     file.write(str(d)+"\n")
     a = 2*d*(d-1)
     for i in range(a):
-        file.write(str(runif(-1,1)) + "\n")
+        file.write(str(rng.uniform(-1,1)) + "\n")
     file.close()
-def pop_initialise(d, out, nInd = 10, nPop = 20): #Population generator (writes the individuals in a file)
+def pop_initialise(d, out, nInd = 10, nPop = 20, rng=None): #Population generator (writes the individuals in a file)
+    rng = make_rng(rng)
     file = open(out, "a")
     for i in range(nPop):
         for j in range(nInd):
             for k in range(d**2):
-                file.write(str(rBit()))
+                file.write(str(rBit(rng)))
             file.write(" ")
         file.write("\n")
     file.close()
@@ -43,12 +46,13 @@ def getPop(input, index): #Retrieve a population relative to a certain index, st
     file = open(input, "r")
     a = file.read().split("\n")[index].split(" ")
     return list2ind(nlc(a)) #Conversion list->individual
-def conf_initialise(d, out):
+def conf_initialise(d, out, rng=None):
+    rng = make_rng(rng)
     file = open(out, "a")
     b = str(d)+"\n"
     file.write(b)
     for i in range(d**2+1):
-        a = str(random())+"\n"
+        a = str(rng.random())+"\n"
         file.write(a)
     file.close()
 def list2ind(pop):
@@ -61,5 +65,5 @@ def list2ind(pop):
         out.append(toolbox.individual(lambda: i))
     return out
 
-#h_initialise(4, "conf1.txt")
-#pop_initialise(4, "pop1.txt")
+#h_initialise(4, "conf1.txt", rng=1)
+#pop_initialise(4, "pop1.txt", rng=1)
@@ -1,5 +1,6 @@
-import random, statistics
+import statistics
 import numpy as np
+from rng_streams import make_rng
 
 def converter(sol, n):
     out = []
@@ -51,8 +52,9 @@ def fitness(inp, n, conf):
                 H+=R[i, j]*S[i, j+1]*S[i,j]
     return -1*(H/2)
 
-def rn():
-    if random.random()>0.5:
+def rn(rng=None):
+    rng = make_rng(rng)
+    if rng.random()>0.5:
         return 1
     else:
         return 0
@@ -61,10 +63,12 @@ class Ising():
     """
     Class Implementing the Ising problem
     """
-    def __init__(self, gs, conf):
+    def __init__(self, gs, conf, rng=None):
         """
         :param gs: grid size (grid size)
+        :param rng: seed or numpy Generator used for the random initial configuration
         """
+        self.rng = make_rng(rng)
         self.gs = gs
         self.N = gs**2 #To see if this line is needed...
         self.conf = conf
@@ -78,7 +82,7 @@ class Ising():
         """
 
         if spin==None:
-            self.spin=[rn() for i in range(0, self.gs**2)]
+            self.spin=[rn(self.rng) for i in range(0, self.gs**2)]
         else:
             self.spin = spin
     def evaluate(self, solution, verbose=False):
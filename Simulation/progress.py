@@ -0,0 +1,86 @@
+import json
+import sys
+import time
+
+
+class ConsoleProgress():
+    """
+    GA_Optimizer observer printing one short line per generation, at most once every min_interval seconds.
+    """
+    def __init__(self, min_interval=1.0, stream=None, label=''):
+        """
+        :param min_interval: (float) minimum number of seconds between two printed lines
+        :param stream: file-like object, sys.stderr by default
+        :param label: (str) prefix identifying the run (useful when several runs share the console)
+        """
+        self.min_interval = min_interval
+        self.stream = stream
+        self.label = label
+        self.last = None
+        self.pending = None
+
+    def __call__(self, event):
+        now = time.monotonic()
+        if self.last is not None and now - self.last < self.min_interval:
+            self.pending = event
+            return
+        self.last = now
+        self._write(event)
+
+    def flush(self):
+        """
+        Print the last event suppressed by the rate limit (called by GA_Optimizer at the end of optimize).
+        """
+        if self.pending is not None:
+            self._write(self.pending)
+
+    def _write(self, event):
+        self.pending = None
+        stream = self.stream if self.stream is not None else sys.stderr
+        stream.write('%sgen %d  evals %d  max %.6g  avg %.6g\n'
+                     % (self.label, event['gen'], event['n_evals'], event['max'], event['avg']))
+        stream.flush()
+
+
+class JsonLinesProgress():
+    """
+    GA_Optimizer observer appending one JSON object per generation to a file.
+    """
+    def __init__(self, filename, every=1, **extra):
+        """
+        :param filename: path of the .jsonl file (opened in append mode)
+        :param every: (int) write one generation every `every` generations
+        :param extra: constant fields added to each line (e.g. operator='qmo', run=3)
+        """
+        self.every = every
+        self.extra = extra
+        self.file = open(filename, 'a')
+        self.pending = None
+
+    def __call__(self, event):
+        if (event['gen'] - 1) % self.every != 0:
+            self.pending = event
+            return
+        self._write(event)
+
+    def flush(self):
+        """
+        Write the last event skipped by `every` (called by GA_Optimizer at the end of optimize).
+        """
+        if self.pending is not None:
+            self._write(self.pending)
+
+    def _write(self, event):
+        self.pending = None
+        self.file.write(json.dumps(dict(self.extra, **event)) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
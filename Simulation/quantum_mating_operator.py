@@ -1,13 +1,27 @@
-import random,math
+import math
 from qiskit import QuantumCircuit, QuantumRegister, execute, Aer, IBMQ, BasicAer
 from qiskit.test.mock import FakeSydney
 from qiskit.providers.aer.noise import NoiseModel, depolarizing_error
 from qiskit.providers.aer.noise import ReadoutError
 import copy
+import numpy as np
 from qiskit.providers.aer.backends import QasmSimulator
+from rng_streams import make_rng, sim_seed
 
 
 
+def bitstring_to_array(state):
+    """
+    Decode a Qiskit measurement string (qubit 0 is the rightmost character) into a bit array
+    ordered by qubit index.
+    ...
+    :param state: measured bitstring
+    ...
+    :return: numpy uint8 array
+    """
+    return np.frombuffer(state.encode('ascii'), dtype=np.uint8)[::-1] - ord('0')
+
+
 def generate_ind_from_count(creator_ind, final_pop, counts):
     """
     Function appending to final_pop the states in the counts vector as list of
@@ -19,10 +33,7 @@ def generate_ind_from_count(creator_ind, final_pop, counts):
     :return: None
     """
     for state in list(counts.keys()):
-        #print(state)
-        ind = []
-        for b in range(len(state)):
-            ind.append(int(state[-1-b]))
+        ind = bitstring_to_array(state).tolist()
         for occurence in range(counts[state]):
             final_pop.append(creator_ind(ind))
 
@@ -32,18 +43,11 @@ def compute_frequencies(ind_list):
     Function compunting the occorence of ones position
     by position of the individuals in the list ind_list.
     ...
-    :param ind_list: list of individuals to mate
+    :param ind_list: list of individuals to mate (or genome matrix)
     ...
     :return: one_frequences as dictionary.
     """
-    ind_size = len(ind_list[0])
-    one_frequences = {i:0 for i in range(ind_size)}
-    for bit in range(ind_size):
-        sum_bit = 0
-        for ind in ind_list:
-            sum_bit = sum_bit + ind[bit]
-        one_frequences[bit] = sum_bit/len(ind_list)
-    return one_frequences
+    return dict(enumerate(np.asarray(ind_list).mean(axis=0).tolist()))
 
 
 def noise_model(prob_1=0.001, prob_2=0.01, p0given1=0.1, p1given0=0.05):
@@ -76,11 +80,12 @@ def noise_model(prob_1=0.001, prob_2=0.01, p0given1=0.1, p1given0=0.05):
 
 
 
-def qmo(pop, ind_size, cx_pb, m_pb, creator_ind, draw_qc=False, **kwargs):
+def qmo(pop, ind_size, cx_pb, m_pb, creator_ind, draw_qc=False, rng=None, **kwargs):
     """
     Function implementing QMO operator. By default, QMO works simulating ideally the quantum circuit created.
     Real quantum devices from IBM Quantum can be used specifying the backend argument.
-    QMO modifies in place pop.
+    QMO modifies in place pop: it is a wrapper converting DEAP individuals to a genome matrix for qmo_matrix.
+    Unselected individuals keep their fitness, children are appended at the end of pop.
     QMO can be distributed according the D-NISQ reference model, by specifying the sub problems size with size_sub_prob
     parameter. It will create several quantum circuits with size at maximum equals to size_sub_prob.
     ...
@@ -90,6 +95,7 @@ def qmo(pop, ind_size, cx_pb, m_pb, creator_ind, draw_qc=False, **kwargs):
     :param (float) m_pb: probability of mutation;
     :param (DEAP Creator) creator_ind: Individual Creator Object from Deap;
     :param (Bool - default False) draw_qc: Show QMO quantum circuit if TRUE.
+    :param rng: seed or numpy Generator for parent selection, mutation rotations and simulator seeds;
     ...
     :keyword (int) **size_sub_prob: sub problem size;
     :keyword **provider: IBMQ provider if real backands or IBMQ simulators have to be used;
@@ -98,65 +104,72 @@ def qmo(pop, ind_size, cx_pb, m_pb, creator_ind, draw_qc=False, **kwargs):
     ...
     :return:
     """
+    mask, children = qmo_matrix(np.asarray(pop, dtype=np.uint8).reshape(len(pop), ind_size), cx_pb, m_pb,
+                                draw_qc=draw_qc, rng=rng, **kwargs)
+    pop[:] = [ind for ind, selected in zip(pop, mask) if not selected] + [creator_ind(c) for c in children.tolist()]
 
-    # Check if QMO has to be distributed according to D-NISQ.
-    if 'size_sub_prob' in kwargs: size_sub_prob = kwargs['size_sub_prob']
-    else: size_sub_prob = ind_size
-
-    to_consider, to_not_consider = [],[]
-    # if random < cx_pb then consider the individual for crossover
-    for ind in pop:
-        if random.random() < cx_pb:
-            del ind.fitness.values
-            to_consider.append(ind)
-            pop.remove(ind)
-    # Build Quantum Circuit
-    if len(to_consider)>0:
-        rotations = compute_frequencies(to_consider)
-        sub_rot = [list(rotations.values())[i:i+size_sub_prob] for i in range(0,ind_size, size_sub_prob)]
-        for iteration in range(len(to_consider)):
-
-            qr = [QuantumRegister(len(sub_rot[i])) for i in range(len(sub_rot))]
-            qc = [QuantumCircuit(i) for i in qr]
-            counts_list = []
-            for sub_prob in range(len(sub_rot)):
-                for bit in range(len(sub_rot[sub_prob])):
-                    #print('bit', bit)
-                    qc[sub_prob].ry(math.pi*sub_rot[sub_prob][bit], qr[sub_prob][bit])
-                    if random.random() < m_pb:
-                        #print('target', target)
-                        qc[sub_prob].ry(math.pi*random.random(),qr[sub_prob][bit])
-                qc[sub_prob].measure_all()
-                if draw_qc:
-                    if 'size_sub_prob' in kwargs:
-                        print('plotting list of sub circuits')
-                    else: print('plot QMO circuit')
-                    for i in range(size_sub_prob):
-                        qc[i].draw('mpl').show()
-
-                # Execute qc
-                if 'backend' not in kwargs:
-                    # QASM SIMULATOR
-                    backend = Aer.get_backend('qasm_simulator')
-                    if 'noise_model' in kwargs:
-                        job = execute(qc[sub_prob], backend, noise_model=kwargs['noise_model'], shots=1, seed_simulator=random.randint(1, 150))
-                    else:
-                        job = execute(qc[sub_prob], backend, shots=1, seed_simulator=random.randint(1, 150))
-                    result = job.result()
-                    counts = result.get_counts()
-                    counts_list.append(counts)
-
-                # CUSTOM BACKEND
-                else:
-                    if 'noise_model' in kwargs:
-                        job = execute(qc[sub_prob], kwargs['backend'], noise_model=kwargs['noise_model'], shots=1,
-                                      seed_simulator=random.randint(1, 150))
-                    else:
-                        job = execute(qc[sub_prob], kwargs['backend'], shots=1, seed_simulator=random.randint(1, 150))
-                    result = job.result()
-                    counts = result.get_counts()
-                    counts_list.append(counts)
-            final_count = list(counts_list[0].keys())[0]
-            for i in range(1, len(counts_list)):
-                final_count += list(counts_list[i].keys())[0]
-            generate_ind_from_count(creator_ind, pop, {final_count:1})
+
+def run_circuit(qc, backend, rng, noise_model=None):
+    """
+    Execute qc with a single shot and return the measured bitstring.
+    ...
+    :param qc: measured QuantumCircuit
+    :param backend: backend executing qc (resolved once by the caller)
+    :param rng: numpy Generator drawing seed_simulator
+    :param noise_model: Qiskit Noise Model Object, None for no noise
+    ...
+    :return: (str) measured state
+    """
+    if noise_model is not None:
+        job = execute(qc, backend, noise_model=noise_model, shots=1, seed_simulator=sim_seed(rng))
+    else:
+        job = execute(qc, backend, shots=1, seed_simulator=sim_seed(rng))
+    return list(job.result().get_counts().keys())[0]
+
+
+def qmo_matrix(genomes, cx_pb, m_pb, draw_qc=False, rng=None, **kwargs):
+    """
+    QMO on a genome matrix. Each row is selected for mating with probability cx_pb; the selected rows
+    are replaced by as many children sampled from the circuit encoding their column-wise one frequencies.
+    ...
+    :param (np.ndarray) genomes: (pop size, problem size) 0/1 matrix;
+    :param (float) cx_pb: probability of crossover;
+    :param (float) m_pb: probability of mutation;
+    :param (Bool - default False) draw_qc: Show QMO quantum circuit if TRUE.
+    :param rng: seed or numpy Generator;
+    ...
+    :keyword (int) **size_sub_prob, **backend, **noise_model: see qmo;
+    ...
+    :return: (mask, children): boolean mask of the selected rows and (mask.sum(), problem size) uint8 matrix
+    """
+    rng = make_rng(rng)
+    genomes = np.asarray(genomes)
+    n, ind_size = genomes.shape
+    size_sub_prob = kwargs['size_sub_prob'] if 'size_sub_prob' in kwargs else ind_size
+
+    mask = rng.random(n) < cx_pb
+    n_children = int(mask.sum())
+    children = np.empty((n_children, ind_size), dtype=np.uint8)
+    if n_children == 0:
+        return mask, children
+    backend = kwargs['backend'] if 'backend' in kwargs else Aer.get_backend('qasm_simulator')
+    rotations = math.pi * genomes[mask].mean(axis=0)
+    bounds = [(i, min(i + size_sub_prob, ind_size)) for i in range(0, ind_size, size_sub_prob)]
+    if draw_qc:
+        if 'size_sub_prob' in kwargs:
+            print('plotting list of sub circuits')
+        else: print('plot QMO circuit')
+    for child in range(n_children):
+        for start, stop in bounds:
+            qr = QuantumRegister(stop - start)
+            qc = QuantumCircuit(qr)
+            mutated = rng.random(stop - start) < m_pb
+            for bit in range(stop - start):
+                qc.ry(rotations[start + bit], qr[bit])
+                if mutated[bit]:
+                    qc.ry(math.pi*rng.random(), qr[bit])
+            qc.measure_all()
+            if draw_qc:
+                qc.draw('mpl').show()
+            children[child, start:stop] = bitstring_to_array(run_circuit(qc, backend, rng, kwargs.get('noise_model')))
+    return mask, children
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def make_rng(seed=None):
+    """
+    Build the random generator threaded through the GA, QMO and the instance generators.
+    ...
+    :param seed: None (fresh OS entropy), int, numpy SeedSequence or an existing numpy Generator.
+        A Generator is returned unchanged, so the same stream can be shared by several objects.
+    ...
+    :return: numpy Generator
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def spawn_seeds(seed, n):
+    """
+    Derive n independent child SeedSequences from seed. Building a Generator twice from the same child
+    gives the same stream (e.g. to run several operators on identical random numbers).
+    ...
+    :param seed: root seed (None, int, SeedSequence or numpy Generator)
+    :param n: (int) number of children
+    ...
+    :return: list of numpy SeedSequences
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed.bit_generator.seed_seq.spawn(n)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
+
+
+def spawn_rngs(seed, n):
+    """
+    Create n statistically independent generators, one per worker, island or run.
+    Streams are derived with SeedSequence.spawn, so run i always gets the same stream
+    for the same root seed, whatever the number of processes used to execute the sweep.
+    ...
+    :param seed: root seed (None, int, SeedSequence or numpy Generator)
+    :param n: (int) number of streams
+    ...
+    :return: list of numpy Generators
+    """
+    return [np.random.default_rng(s) for s in spawn_seeds(seed, n)]
+
+
+def sim_seed(rng):
+    """
+    Draw a seed for a single Aer simulation from rng (full 32-bit range).
+    ...
+    :param rng: numpy Generator
+    ...
+    :return: (int) seed_simulator value
+    """
+    return int(rng.integers(0, 2**32))